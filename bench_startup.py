@@ -0,0 +1,99 @@
+"""
+BENCHMARK DE INICIALIZAÇÃO DO APP
+
+Mede o tempo de uma execução "a frio" do tensaoUT_app.py (interpretador novo,
+Streamlit em modo bare) e verifica que os módulos pesados não são importados
+antes de haver dados para processar.
+
+Uso:
+    python bench_startup.py [--repeticoes N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tensaoUT_app.py")
+
+# Módulos que só devem ser carregados pelas etapas que os utilizam
+MODULOS_PESADOS = ["matplotlib", "scipy", "scipy.interpolate", "scipy.signal", "seaborn"]
+
+_SCRIPT_APP = """
+import json, runpy, sys, time, warnings, logging
+warnings.filterwarnings("ignore")
+logging.disable(logging.CRITICAL)
+t0 = time.perf_counter()
+runpy.run_path({app!r}, run_name="__main__")
+dt = time.perf_counter() - t0
+print(json.dumps({{"tempo_s": dt, "carregados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+_SCRIPT_MODULO = """
+import importlib, json, time
+t0 = time.perf_counter()
+importlib.import_module({modulo!r})
+print(json.dumps({{"tempo_s": time.perf_counter() - t0}}))
+"""
+
+
+def _executar(codigo):
+    """
+    Executa código em um interpretador novo e retorna a última linha JSON
+    """
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo],
+        cwd=os.path.dirname(APP),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def medir_app(repeticoes):
+    """
+    Tempo de inicialização a frio do app (mínimo de N execuções)
+    """
+    resultados = [
+        _executar(_SCRIPT_APP.format(app=APP, pesados=MODULOS_PESADOS))
+        for _ in range(repeticoes)
+    ]
+    return min(r["tempo_s"] for r in resultados), resultados[-1]["carregados"]
+
+
+def medir_modulo(modulo, repeticoes):
+    """
+    Custo isolado de importar um módulo pesado (mínimo de N execuções)
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        try:
+            tempos.append(_executar(_SCRIPT_MODULO.format(modulo=modulo))["tempo_s"])
+        except subprocess.CalledProcessError:
+            return None
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    print("Custo de importação isolado (evitado na inicialização):")
+    for modulo in MODULOS_PESADOS:
+        t = medir_modulo(modulo, args.repeticoes)
+        status = f"{t * 1000:8.1f} ms" if t is not None else "  não instalado"
+        print(f"  {modulo:<20s}{status}")
+
+    tempo, carregados = medir_app(args.repeticoes)
+    print(f"\nInicialização a frio do app: {tempo * 1000:.1f} ms")
+    if carregados:
+        print(f"⚠️ Módulos pesados carregados na inicialização: {', '.join(carregados)}")
+        sys.exit(1)
+    print("✓ Nenhum módulo pesado carregado na inicialização")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,12 @@ técnicas complementares (difração de raios-X, furo incremental).
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.interpolate import griddata
-from scipy.signal import hilbert
 from io import BytesIO
-import base64
+import re
+import warnings
+
+# matplotlib e scipy são importados apenas nas etapas que os utilizam
+# (interpolação e gráficos), reduzindo o tempo de inicialização do app.
 
 # Configuração da página
 st.set_page_config(
@@ -30,6 +30,23 @@ st.set_page_config(
 # FUNÇÕES AUXILIARES
 # ============================================================================
 
+def _pyplot():
+    """
+    Importa matplotlib.pyplot sob demanda (backend não interativo)
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+@st.cache_data
+def carregar_readme(caminho="readme.md"):
+    """
+    Lê o README do disco uma única vez; reruns reutilizam o conteúdo em cache
+    """
+    with open(caminho, encoding="utf-8") as f:
+        return f.read()
+
 @st.cache_data
 def gerar_dados_sinteticos(nx=50, ny=40, noise_level=0.02):
     """
@@ -133,6 +150,8 @@ def interpolar_grade(df, coluna_valor):
     """
     Interpola dados irregulares em grade regular para plotagem
     """
+    from scipy.interpolate import griddata
+    
     x = df['x'].values
     y = df['y'].values
     z = df[coluna_valor].values
@@ -160,10 +179,12 @@ def interpolar_grade(df, coluna_valor):
     
     return Xi, Yi, Zi, (x_min, x_max, y_min, y_max)
 
-def plotar_heatmap(Xi, Yi, Zi, titulo, colormap, vmin_percentil, vmax_percentil):
+def plotar_heatmap(Xi, Yi, Zi, titulo, colormap, vmin_percentil, vmax_percentil,
+                   rotulo='Índice de Tensão (Δv/v)'):
     """
     Cria heatmap profissional do índice de tensão
     """
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(10, 8))
     
     # Calcular limites de cor baseados em percentis
@@ -178,7 +199,7 @@ def plotar_heatmap(Xi, Yi, Zi, titulo, colormap, vmin_percentil, vmax_percentil)
     im = ax.pcolormesh(Xi, Yi, Zi, cmap=colormap, shading='auto',
                        vmin=vmin, vmax=vmax)
     
-    cbar = plt.colorbar(im, ax=ax, label='Índice de Tensão (Δv/v)')
+    cbar = plt.colorbar(im, ax=ax, label=rotulo)
     
     # Formatação
     ax.set_xlabel('Posição X (mm)', fontsize=12)
@@ -194,6 +215,7 @@ def criar_histograma(dados, titulo):
     """
     Cria histograma da distribuição do índice
     """
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(8, 5))
     
     dados_limpos = dados[np.isfinite(dados)]
@@ -213,6 +235,378 @@ def criar_histograma(dados, titulo):
     plt.tight_layout()
     return fig
 
+# ============================================================================
+# A-SCAN MULTI-GATE (PERFIL EM PROFUNDIDADE)
+# ============================================================================
+
+@st.cache_data
+def gerar_ascan_sintetico(nx=50, ny=40, noise_level=0.02, dt_us=0.01, nt=800):
+    """
+    Gera cubo A-scan sintético [ny, nx, nt] com três ecos (interface,
+    refletor intermediário a 5 mm e fundo a 10 mm) e gradiente de tensão
+    diferente em cada camada
+    """
+    x = np.linspace(0, 100, nx)  # mm
+    y = np.linspace(0, 80, ny)   # mm
+    X, Y = np.meshgrid(x, y)
+    tempo_us = np.arange(nt) * dt_us
+
+    # Camada superior: gradiente radial; camada inferior: gradiente em X
+    dist = np.sqrt((X - 50)**2 + (Y - 40)**2)
+    idx_camadas = [0.001 * (1 - dist / 60), 0.001 * (X / 100 - 0.5)]
+
+    # TOF acumulado de cada eco (ida e volta, v_ref = 5900 m/s, 5 mm por camada)
+    tof_ecos = [np.full(X.shape, 2.0)]
+    for idx in idx_camadas:
+        v = 5900 * (1 + idx + noise_level * 1e-2 * np.random.randn(*X.shape))
+        tof_ecos.append(tof_ecos[-1] + (2 * 0.005 / v) * 1e6)
+
+    # Pulso gaussiano modulado de 5 MHz em cada eco
+    cubo = np.zeros((ny, nx, nt))
+    for amp, tof in zip([1.0, 0.4, 0.6], tof_ecos):
+        tau = tempo_us[None, None, :] - tof[..., None]
+        cubo += amp * np.exp(-(tau / 0.15)**2) * np.cos(2 * np.pi * 5.0 * tau)
+    cubo += 0.1 * noise_level * np.random.randn(*cubo.shape)
+
+    return cubo, tempo_us, x, y
+
+def carregar_ascan(arquivo, dt_us, t0_us, passo_mm):
+    """
+    Lê cubo A-scan de arquivo .npy ou .npz
+
+    Formato: data_cube [ny, nx, nt]; no .npz, time_vector [nt] (μs) e
+    x [nx], y [ny] (mm) são opcionais
+
+    Returns:
+        cubo, tempo_us, x, y
+    """
+    dados = np.load(arquivo, allow_pickle=False)
+    if isinstance(dados, np.ndarray):
+        cubo, extras = dados, {}
+    else:
+        chave = 'data_cube' if 'data_cube' in dados.files else dados.files[0]
+        cubo, extras = dados[chave], {k: dados[k] for k in dados.files if k != chave}
+
+    if cubo.ndim != 3:
+        raise ValueError(f"cubo A-scan deve ter 3 dimensões [ny, nx, nt], recebido {cubo.shape}")
+    ny, nx, nt = cubo.shape
+
+    tempo_us = extras.get('time_vector', t0_us + np.arange(nt) * dt_us)
+    x = extras.get('x', np.arange(nx) * passo_mm)
+    y = extras.get('y', np.arange(ny) * passo_mm)
+    if len(tempo_us) != nt or len(x) != nx or len(y) != ny:
+        raise ValueError("time_vector, x e y devem ser compatíveis com o shape do cubo")
+
+    return cubo, np.asarray(tempo_us, dtype=float), np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+
+_NUMERO = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+_PADRAO_GATE = re.compile(rf'^\s*({_NUMERO})\s*-\s*({_NUMERO})\s*$')
+
+def parsear_gates(texto):
+    """
+    Converte texto de gates em lista [(t_ini, t_fim), ...] em μs
+
+    Um gate por linha ou separados por ';', no formato "início-fim"
+    (ex: "1.8-2.3; 3.4-4.0; 5.1-5.8"). Aceita sinal e notação
+    científica (ex: "-0.5-1.2", "1e-3-2")
+    """
+    gates = []
+    for trecho in texto.replace('\n', ';').split(';'):
+        trecho = trecho.strip()
+        if not trecho:
+            continue
+        correspondencia = _PADRAO_GATE.match(trecho)
+        if correspondencia is None:
+            raise ValueError(f"gate inválido '{trecho}' (use início-fim em μs)")
+        ini, fim = (float(v) for v in correspondencia.groups())
+        if fim <= ini:
+            raise ValueError(f"gate '{trecho}' com fim menor ou igual ao início")
+        gates.append((ini, fim))
+
+    if not gates:
+        raise ValueError("nenhum gate definido")
+    return gates
+
+def extrair_tof_gates(cubo, tempo_us, gates, margem=64):
+    """
+    Detecta o eco dentro de cada gate para todos os A-scans
+
+    O TOF é o centroide da envoltória (Hilbert) acima de 50% do seu pico,
+    mais robusto ao ruído que o pico isolado para atrasos sub-amostra.
+
+    Cada gate é processado de forma vetorizada sobre todos os A-scans, em uma
+    janela com `margem` amostras reais do sinal de cada lado: a envoltória
+    não sofre efeito de borda no gate e o resultado de um gate não depende
+    dos demais. O centroide usa apenas as amostras do próprio gate, e o custo
+    é proporcional às amostras gateadas e não ao comprimento do A-scan.
+
+    Args:
+        cubo: A-scans [ny, nx, nt]
+        tempo_us: vetor de tempo [nt] em microssegundos
+        gates: lista [(t_ini, t_fim), ...] em microssegundos
+        margem: amostras de guarda de cada lado do gate
+
+    Returns:
+        pilha de TOF [n_gates, ny, nx] em μs (NaN para gates fora do sinal)
+    """
+    from scipy.signal import hilbert
+
+    nt = cubo.shape[-1]
+    limites = np.searchsorted(tempo_us, np.asarray(gates, dtype=float))
+    pilha_tof = np.full((len(gates),) + cubo.shape[:-1], np.nan)
+
+    for k, (i0, i1) in enumerate(limites):
+        if i1 <= i0:
+            continue
+
+        # Envoltória na janela com guarda, recortada de volta ao gate
+        j0, j1 = max(i0 - margem, 0), min(i1 + margem, nt)
+        envoltoria = np.abs(hilbert(cubo[..., j0:j1], axis=-1))[..., i0 - j0:i1 - j0]
+
+        # Centroide da envoltória acima de meia altura (posição sub-amostra)
+        limiar = 0.5 * envoltoria.max(axis=-1, keepdims=True)
+        pesos = np.maximum(envoltoria - limiar, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            posicao = (pesos @ np.arange(i1 - i0)) / pesos.sum(axis=-1)
+
+        tof = np.interp(i0 + posicao, np.arange(nt), tempo_us)
+        tof[~np.isfinite(posicao)] = np.nan
+        pilha_tof[k] = tof
+
+    return pilha_tof
+
+def parsear_profundidades(texto, n_camadas):
+    """
+    Converte texto de profundidades dos refletores (mm) em array [n_camadas]
+
+    Um valor por linha ou separados por ';', medidos a partir da superfície
+    e estritamente crescentes (ex: "5; 10")
+    """
+    try:
+        profundidades = np.array([float(v) for v in texto.replace('\n', ';').split(';') if v.strip()])
+    except ValueError:
+        raise ValueError("profundidades devem ser números em mm")
+
+    if len(profundidades) != n_camadas:
+        raise ValueError(f"informe {n_camadas} profundidade(s), uma por refletor, "
+                         f"recebido {len(profundidades)}")
+    if profundidades[0] <= 0 or np.any(np.diff(profundidades) <= 0):
+        raise ValueError("profundidades devem ser positivas e crescentes")
+    return profundidades
+
+@st.cache_data
+def calcular_pilha_gates(cubo, tempo_us, gates, referencia_interface):
+    """
+    Pilha de TOF por camada [n_camadas, ny, nx] em μs
+
+    Cada camada é a fatia entre dois refletores consecutivos: seu TOF é a
+    diferença entre os ecos de gates vizinhos. Com referência na interface,
+    o primeiro gate marca a superfície (t = 0 da primeira camada) e não gera
+    camada; sem ela, a primeira camada é medida a partir de t = 0.
+    """
+    pilha_tof = extrair_tof_gates(cubo, tempo_us, gates)
+    if referencia_interface:
+        return np.diff(pilha_tof, axis=0)
+    return np.diff(pilha_tof, axis=0, prepend=0.0)
+
+def selecionar_roi(x, y):
+    """
+    Sliders da região de referência (ROI)
+
+    Returns:
+        máscara booleana dos pontos (x, y) dentro do ROI
+    """
+    col1, col2 = st.columns(2)
+    with col1:
+        x_min_roi = st.slider("X mínimo (mm)", 
+                              float(np.min(x)), 
+                              float(np.max(x)), 
+                              float(np.min(x)))
+        x_max_roi = st.slider("X máximo (mm)", 
+                              float(np.min(x)), 
+                              float(np.max(x)), 
+                              float(np.max(x)))
+    with col2:
+        y_min_roi = st.slider("Y mínimo (mm)", 
+                              float(np.min(y)), 
+                              float(np.max(y)), 
+                              float(np.min(y)))
+        y_max_roi = st.slider("Y máximo (mm)", 
+                              float(np.min(y)), 
+                              float(np.max(y)), 
+                              float(np.max(y)))
+    
+    return (
+        (x >= x_min_roi) & (x <= x_max_roi) &
+        (y >= y_min_roi) & (y <= y_max_roi)
+    )
+
+def plotar_secao_transversal(x, pilha, titulo, colormap, vmin_percentil, vmax_percentil,
+                             profundidades=None):
+    """
+    Seção transversal profundidade × X de uma linha da pilha [n_camadas, nx]
+    """
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(10, 4))
+
+    z_flat = pilha[np.isfinite(pilha)]
+    if len(z_flat) > 0:
+        vmin = np.percentile(z_flat, vmin_percentil)
+        vmax = np.percentile(z_flat, vmax_percentil)
+    else:
+        vmin, vmax = -0.001, 0.001
+
+    if profundidades is not None:
+        # Bordas das fatias entre refletores, em mm a partir da superfície
+        bordas_z = np.concatenate([[0.0], profundidades])
+        meio_passo = (x[1] - x[0]) / 2 if len(x) > 1 else 0.5
+        bordas_x = np.concatenate([[x[0] - meio_passo], (x[:-1] + x[1:]) / 2,
+                                   [x[-1] + meio_passo]])
+        im = ax.pcolormesh(bordas_x, bordas_z, pilha, cmap=colormap, shading='flat',
+                           vmin=vmin, vmax=vmax)
+        ax.set_ylabel('Profundidade (mm)', fontsize=12)
+    else:
+        camadas = np.arange(1, pilha.shape[0] + 1)
+        im = ax.pcolormesh(x, camadas, pilha, cmap=colormap, shading='nearest',
+                           vmin=vmin, vmax=vmax)
+        ax.set_ylabel('Camada (gate)', fontsize=12)
+        ax.set_yticks(camadas)
+    plt.colorbar(im, ax=ax, label='Índice de Tensão (Δv/v)')
+
+    ax.set_xlabel('Posição X (mm)', fontsize=12)
+    ax.invert_yaxis()
+    ax.set_title(titulo, fontsize=14, fontweight='bold')
+
+    plt.tight_layout()
+    return fig
+
+# ============================================================================
+# INCERTEZA (MONTE CARLO)
+# ============================================================================
+
+def _percentis_por_coluna(amostras, q):
+    """
+    Percentis por coluna de [n_amostras, n_pontos]
+
+    np.nanpercentile itera coluna a coluna em Python; np.percentile é
+    vetorizado, então a versão NaN-aware fica restrita às colunas com NaN
+    """
+    percentis = np.percentile(amostras, q, axis=0)
+    com_nan = np.isnan(amostras).any(axis=0)
+    if com_nan.any():
+        percentis[:, com_nan] = np.nanpercentile(amostras[:, com_nan], q, axis=0)
+    return percentis
+
+@st.cache_data
+def propagar_incerteza_mc(tof_us, espessura_mm, v_ref, K, incertezas,
+                          temp_medida, temp_ref, coef_termico, mascara_roi=None,
+                          n_amostras=500, nivel_confianca=95.0,
+                          max_elementos=2_000_000, semente=0):
+    """
+    Propaga as incertezas de entrada pela cadeia velocidade → correção
+    térmica → índice → σ por Monte Carlo vetorizado
+
+    Erros de TOF são sorteados por ponto; espessura, temperatura, v_ref
+    e K são erros sistemáticos, sorteados uma vez por amostra e compartilhados
+    por todos os pontos. Com ROI, v_ref não é sorteado: em cada amostra ele é
+    a média das velocidades corrigidas da própria amostra dentro do ROI, como
+    no cálculo nominal, e os erros comuns se cancelam no índice. Os pontos são processados em blocos de arrays
+    [n_amostras, n_bloco] com n_amostras × n_bloco ≤ max_elementos, limitando
+    a memória independentemente do tamanho do mapa.
+
+    Args:
+        tof_us: tempo de voo por ponto em microssegundos
+        espessura_mm: espessura nominal em milímetros
+        v_ref: velocidade de referência nominal (m/s)
+        K: constante acustoelástica nominal (None para omitir σ)
+        incertezas: desvios padrão (normais) {'espessura_mm', 'tof_us',
+            'temperatura', 'v_ref', 'K_rel'}; K_rel é relativo (fração de K)
+        mascara_roi: máscara booleana dos pontos do ROI (None para v_ref manual)
+        n_amostras: número de amostras Monte Carlo
+        nivel_confianca: nível do intervalo de confiança em %
+
+    Returns:
+        dict com arrays por ponto ('indice_std', 'indice_ic_inf',
+        'indice_ic_sup' e, com K, os equivalentes 'sigma_*' em MPa) e as
+        amostras da média global ('indice_media', 'sigma_media')
+    """
+    rng = np.random.default_rng(semente)
+    tof_us = np.asarray(tof_us, dtype=float)
+    n_pontos = len(tof_us)
+    q = [(100 - nivel_confianca) / 2, (100 + nivel_confianca) / 2]
+
+    # Erros sistemáticos [n_amostras, 1]
+    esp_amostras = espessura_mm + incertezas['espessura_mm'] * rng.standard_normal((n_amostras, 1))
+    temp_amostras = temp_medida + incertezas['temperatura'] * rng.standard_normal((n_amostras, 1))
+    if K:
+        K_amostras = K * (1 + incertezas['K_rel'] * rng.standard_normal((n_amostras, 1)))
+
+    n_bloco = max(1, max_elementos // n_amostras)
+    blocos = [slice(inicio, min(inicio + n_bloco, n_pontos))
+              for inicio in range(0, n_pontos, n_bloco)]
+
+    def velocidades_bloco(bloco):
+        # Erros aleatórios por ponto [n_amostras, n_bloco], com semente própria
+        # do bloco para que o ROI e o índice vejam as mesmas amostras
+        rng_bloco = np.random.default_rng([semente, bloco.start])
+        forma = (n_amostras, bloco.stop - bloco.start)
+        tof = tof_us[bloco] + incertezas['tof_us'] * rng_bloco.standard_normal(forma)
+
+        v = calcular_velocidade_longitudinal(tof, esp_amostras)
+        return aplicar_correcao_termica(v, temp_amostras, temp_ref, coef_termico)
+
+    if mascara_roi is not None:
+        # v_ref de cada amostra: média das velocidades corrigidas no ROI
+        mascara_roi = np.asarray(mascara_roi, dtype=bool)
+        soma_roi = np.zeros(n_amostras)
+        contagem_roi = np.zeros(n_amostras)
+        for bloco in blocos:
+            if mascara_roi[bloco].any():
+                v_roi = velocidades_bloco(bloco)[:, mascara_roi[bloco]]
+                soma_roi += np.nansum(v_roi, axis=1)
+                contagem_roi += np.sum(np.isfinite(v_roi), axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            v_ref_amostras = (soma_roi / contagem_roi)[:, None]
+    else:
+        v_ref_amostras = v_ref + incertezas['v_ref'] * rng.standard_normal((n_amostras, 1))
+
+    resultado = {nome: np.full(n_pontos, np.nan) for nome in
+                 ['indice_std', 'indice_ic_inf', 'indice_ic_sup']}
+    if K:
+        resultado.update({nome: np.full(n_pontos, np.nan) for nome in
+                          ['sigma_std', 'sigma_ic_inf', 'sigma_ic_sup']})
+    soma_idx = np.zeros(n_amostras)
+    soma_sigma = np.zeros(n_amostras)
+    contagem = np.zeros(n_amostras)
+
+    for bloco in blocos:
+        idx = calcular_indice_tensao(velocidades_bloco(bloco), v_ref_amostras)
+
+        # Pontos sem nenhuma amostra válida permanecem NaN
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            resultado['indice_std'][bloco] = np.nanstd(idx, axis=0)
+            resultado['indice_ic_inf'][bloco], resultado['indice_ic_sup'][bloco] = \
+                _percentis_por_coluna(idx, q)
+        soma_idx += np.nansum(idx, axis=1)
+        contagem += np.sum(np.isfinite(idx), axis=1)
+
+        if K:
+            sigma = idx / K_amostras
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                resultado['sigma_std'][bloco] = np.nanstd(sigma, axis=0)
+                resultado['sigma_ic_inf'][bloco], resultado['sigma_ic_sup'][bloco] = \
+                    _percentis_por_coluna(sigma, q)
+            soma_sigma += np.nansum(sigma, axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resultado['indice_media'] = soma_idx / contagem
+        if K:
+            resultado['sigma_media'] = soma_sigma / contagem
+
+    return resultado
+
 def gerar_relatorio(df_resultados, parametros):
     """
     Gera relatório em texto/markdown com sumário da análise
@@ -239,7 +633,16 @@ def gerar_relatorio(df_resultados, parametros):
 - **Constante acustoelástica K:** {parametros.get('K', 'Não informada')}
 - **Colormap:** {parametros.get('colormap', 'viridis')}
 - **Total de pontos:** {len(df_resultados)}
-
+"""
+    
+    if parametros.get('gates'):
+        relatorio += f"""- **Gates de tempo (A-scan):** {parametros['gates']}
+- **Camada analisada:** {parametros.get('camada', 'N/A')}
+- **Profundidade dos refletores:** {parametros.get('profundidades', 'N/A')}
+- **Referência das camadas:** {parametros.get('referencia_camadas', 'N/A')}
+"""
+    
+    relatorio += f"""
 ---
 
 ## ESTATÍSTICAS DO ÍNDICE DE TENSÃO (Δv/v)
@@ -276,6 +679,42 @@ def gerar_relatorio(df_resultados, parametros):
         relatorio += """
 ⚠️ **Constante K não fornecida.** Resultados permanecem em unidades relativas (Δv/v).
 Para conversão em MPa, determine K experimentalmente para seu material.
+"""
+    
+    if parametros.get('incerteza'):
+        inc = parametros['incerteza']
+        entradas, res = inc['entradas'], inc['resultado']
+        nivel = inc['nivel_confianca']
+        q = [(100 - nivel) / 2, (100 + nivel) / 2]
+        ic_media = np.nanpercentile(res['indice_media'], q)
+        relatorio += f"""
+---
+
+## INCERTEZA (MONTE CARLO)
+
+**Entradas (1 desvio padrão, distribuição normal):**
+
+- **Espessura:** ±{entradas['espessura_mm']:.3f} mm (sistemático)
+- **TOF:** ±{entradas['tof_us']:.4f} μs (por ponto)
+- **Temperatura:** ±{entradas['temperatura']:.2f} °C (sistemático)
+- **v_ref:** {'recalculado do ROI em cada amostra' if inc.get('v_ref_roi') else f"±{entradas['v_ref']:.2f} m/s (sistemático)"}
+- **K:** ±{100 * entradas['K_rel']:.1f} % (sistemático)
+- **Amostras:** {inc['n_amostras']} | **Nível de confiança:** {nivel:g}%
+
+**Resultados:**
+
+- **Desvio padrão do índice por ponto (mediana):** {np.nanmedian(res['indice_std']):.6e}
+- **Desvio padrão do índice por ponto (máximo):** {np.nanmax(res['indice_std']):.6e}
+- **Largura média do IC {nivel:g}% por ponto:** {np.nanmean(res['indice_ic_sup'] - res['indice_ic_inf']):.6e}
+- **IC {nivel:g}% do índice médio:** [{ic_media[0]:.6e}, {ic_media[1]:.6e}]
+"""
+        if 'sigma_std' in res:
+            ic_sigma = np.nanpercentile(res['sigma_media'], q)
+            relatorio += f"""- **Desvio padrão de σ por ponto (mediana):** {np.nanmedian(res['sigma_std']):.2f} MPa
+- **IC {nivel:g}% da tensão média:** [{ic_sigma[0]:.2f}, {ic_sigma[1]:.2f}] MPa
+"""
+        relatorio += """
+Mapas por ponto (desvio padrão e limites do IC) estão incluídos no CSV exportado.
 """
     
     relatorio += f"""
@@ -293,7 +732,9 @@ Para conversão em MPa, determine K experimentalmente para seu material.
    Variações significativas de temperatura exigem caracterização mais detalhada.
 
 4. **Profundidade de análise:** Ondas longitudinais sampleiam toda a espessura.
-   Para tensões superficiais, considere ondas de superfície (Rayleigh).
+   Para tensões superficiais, considere ondas de superfície (Rayleigh). O modo
+   A-scan multi-gate resolve camadas entre refletores, mas cada camada ainda
+   representa a média ao longo do seu caminho parcial.
 
 5. **Calibração:** Sempre que possível, valide resultados com técnica independente
    em pontos selecionados (ex: difração de raios-X).
@@ -329,26 +770,32 @@ st.sidebar.header("⚙️ Parâmetros de Análise")
 # Modo de medição
 modo = st.sidebar.selectbox(
     "Modo de medição",
-    ["Longitudinal (TOF)", "Cisalhante (birefringência)"],
-    help="Longitudinal: mede tempo de voo (TOF) de ondas longitudinais. Cisalhante: mede diferença de velocidade entre polarizações."
+    ["Longitudinal (TOF)", "Cisalhante (birefringência)", "A-scan multi-gate (NPY/NPZ)"],
+    help="Longitudinal: mede tempo de voo (TOF) de ondas longitudinais. Cisalhante: mede diferença de velocidade entre polarizações. A-scan multi-gate: detecta ecos em vários gates de tempo para um perfil de tensão em profundidade."
 )
 
-# Espessura
-espessura_mm = st.sidebar.number_input(
-    "Espessura do componente (mm)",
-    min_value=0.1,
-    max_value=500.0,
-    value=10.0,
-    step=0.1,
-    help="Espessura da peça na direção de propagação da onda"
-)
+# Espessura (no modo A-scan, substituída pelas profundidades dos refletores)
+if modo != "A-scan multi-gate (NPY/NPZ)":
+    espessura_mm = st.sidebar.number_input(
+        "Espessura do componente (mm)",
+        min_value=0.1,
+        max_value=500.0,
+        value=10.0,
+        step=0.1,
+        help="Espessura da peça na direção de propagação da onda"
+    )
 
 # Velocidade de referência
 st.sidebar.subheader("Velocidade de Referência")
+opcoes_ref = ["Valor numérico", "ROI (região de interesse)"]
+if modo == "A-scan multi-gate (NPY/NPZ)":
+    opcoes_ref.append("Mediana de cada camada (somente variação dentro da camada)")
 metodo_ref = st.sidebar.radio(
     "Método de definição",
-    ["Valor numérico", "ROI (região de interesse)"],
-    help="Defina v_ref manualmente ou selecione região nos dados"
+    opcoes_ref,
+    help="Defina v_ref manualmente ou selecione região nos dados. No modo A-scan, o ROI "
+         "define uma referência por camada; a mediana por camada zera a média de cada "
+         "camada e não permite comparar camadas entre si"
 )
 
 if metodo_ref == "Valor numérico":
@@ -397,6 +844,85 @@ else:
     temp_ref = 20.0
     temp_medida = 20.0
 
+# Incerteza (Monte Carlo)
+st.sidebar.subheader("Incerteza (Opcional)")
+usar_mc = st.sidebar.checkbox(
+    "Propagar incertezas por Monte Carlo",
+    help="Mapas de desvio padrão e intervalo de confiança do índice (e de σ, com K). Disponível no modo longitudinal."
+)
+if usar_mc:
+    incertezas = {
+        'espessura_mm': st.sidebar.number_input(
+            "σ espessura (mm)", min_value=0.0, value=0.01, step=0.005, format="%.3f",
+            help="Tolerância da espessura nominal (1 desvio padrão, sistemático: a mesma em todos os pontos)"
+        ),
+        'tof_us': st.sidebar.number_input(
+            "σ TOF (μs)", min_value=0.0, value=0.001, step=0.0005, format="%.4f",
+            help="Jitter de medição do tempo de voo (1 desvio padrão, por ponto)"
+        ),
+        'temperatura': st.sidebar.number_input(
+            "σ temperatura (°C)", min_value=0.0, value=0.5, step=0.1,
+            help="Erro da temperatura medida (sistemático). Só tem efeito com correção térmica"
+        ),
+        'v_ref': st.sidebar.number_input(
+            "σ v_ref (m/s)", min_value=0.0, value=1.0, step=0.5,
+            help="Incerteza de v_ref no modo manual. Ignorado com ROI: v_ref é recalculado do ROI em cada amostra"
+        ),
+        'K_rel': st.sidebar.number_input(
+            "σ K (%)", min_value=0.0, value=10.0, step=1.0,
+            help="Incerteza relativa da constante acustoelástica"
+        ) / 100.0,
+    }
+    n_amostras_mc = st.sidebar.select_slider("Amostras Monte Carlo", [100, 200, 500, 1000, 2000], 500)
+    nivel_confianca = st.sidebar.select_slider("Nível de confiança (%)", [68.0, 90.0, 95.0, 99.0], 95.0)
+
+# Gates de tempo (A-scan)
+if modo == "A-scan multi-gate (NPY/NPZ)":
+    st.sidebar.subheader("Gates de Tempo (A-scan)")
+    gates_texto = st.sidebar.text_area(
+        "Gates (μs)",
+        value="1.8-2.3\n3.4-4.0\n5.1-5.8",
+        help="Um gate por linha no formato início-fim (μs), um por eco: interface, refletores intermediários, fundo(s)"
+    )
+    referencia_interface = st.sidebar.checkbox(
+        "Primeiro gate é o eco de interface",
+        value=True,
+        help="Mede o TOF de cada camada a partir do eco do primeiro gate (caminho parcial)"
+    )
+    dt_ascan = st.sidebar.number_input(
+        "Intervalo de amostragem (μs)",
+        min_value=0.0001,
+        value=0.01,
+        format="%.4f",
+        help="Usado quando o arquivo não contém time_vector"
+    )
+    profundidades_texto = st.sidebar.text_area(
+        "Profundidade dos refletores (mm)",
+        value="5\n10",
+        help="Uma por camada, a partir da superfície: o refletor de cada gate (exceto o de "
+             "interface). Cada camada é a fatia entre dois refletores consecutivos"
+    )
+    t0_ascan = st.sidebar.number_input("Tempo inicial (μs)", value=0.0, step=0.1)
+    passo_varredura = st.sidebar.number_input(
+        "Passo da varredura (mm)",
+        min_value=0.01,
+        value=1.0,
+        step=0.1,
+        help="Espaçamento entre A-scans, usado quando o arquivo não contém x e y"
+    )
+    try:
+        gates = parsear_gates(gates_texto)
+        if referencia_interface and len(gates) < 2:
+            raise ValueError("defina ao menos dois gates quando o primeiro é o eco de interface")
+        profundidades = parsear_profundidades(
+            profundidades_texto, len(gates) - 1 if referencia_interface else len(gates)
+        )
+        espessura_mm = float(profundidades[-1])
+    except ValueError as e:
+        st.sidebar.error(f"❌ {e}")
+        gates = None
+        espessura_mm = None
+
 # Visualização
 st.sidebar.subheader("Visualização")
 passo_malha = st.sidebar.number_input(
@@ -434,17 +960,33 @@ with tab1:
     - Modo Longitudinal: colunas `x`, `y`, `tof_us` (tempo de voo em microssegundos)
     - Modo Cisalhante: colunas `x`, `y`, `v1`, `v2` (velocidades em m/s)
     - Coordenadas x, y em milímetros
+    
+    **Formato A-scan (NPY/NPZ):** `data_cube` [ny, nx, nt]; opcionais no NPZ:
+    `time_vector` [nt] (μs), `x` [nx] e `y` [ny] (mm)
     """)
     
     uploaded_file = st.file_uploader(
-        "Selecione arquivo CSV ou Excel",
-        type=['csv', 'xlsx', 'xls'],
+        "Selecione arquivo CSV, Excel ou NPY/NPZ",
+        type=['csv', 'xlsx', 'xls', 'npy', 'npz'],
         help="Arquivo com dados de varredura ultrassônica"
     )
     
     df_original = None
+    ascan = None
     
-    if uploaded_file is not None:
+    if uploaded_file is not None and uploaded_file.name.endswith(('.npy', '.npz')):
+        if modo != "A-scan multi-gate (NPY/NPZ)":
+            st.warning("⚠️ Arquivos NPY/NPZ requerem o modo A-scan multi-gate")
+        else:
+            try:
+                ascan = carregar_ascan(uploaded_file, dt_ascan, t0_ascan, passo_varredura)
+                ny_a, nx_a, nt_a = ascan[0].shape
+                st.success(f"✅ Cubo A-scan carregado: {ny_a} × {nx_a} A-scans, {nt_a} amostras")
+            except Exception as e:
+                st.error(f"Erro ao carregar arquivo: {str(e)}")
+    elif uploaded_file is not None and modo == "A-scan multi-gate (NPY/NPZ)":
+        st.warning("⚠️ O modo A-scan multi-gate requer um cubo NPY/NPZ")
+    elif uploaded_file is not None:
         try:
             if uploaded_file.name.endswith('.csv'):
                 df_original = pd.read_csv(uploaded_file)
@@ -459,14 +1001,6 @@ with tab1:
 
 with tab2:
     st.markdown("**Gerar dataset sintético para testar a interface**")
-
-with tab3:
-    try:
-        with open("readme.md", encoding="utf-8") as f:
-            readme_content = f.read()
-        st.markdown(readme_content, unsafe_allow_html=True)
-    except Exception as e:
-        st.error(f"Não foi possível carregar o README: {e}")
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -476,7 +1010,17 @@ with tab3:
     with col3:
         noise = st.slider("Nível de ruído", 0.0, 0.1, 0.02, 0.01)
     
-    if st.button("🎲 Gerar Dados Sintéticos"):
+    if modo == "A-scan multi-gate (NPY/NPZ)":
+        # Mantido na sessão para sobreviver aos reruns do slider de camadas
+        if st.button("🎲 Gerar Cubo A-scan Sintético"):
+            st.session_state['ascan_sintetico'] = gerar_ascan_sintetico(nx_sint, ny_sint, noise)
+        if ascan is None and 'ascan_sintetico' in st.session_state:
+            ascan = st.session_state['ascan_sintetico']
+            ny_a, nx_a, nt_a = ascan[0].shape
+            st.success(f"✅ Cubo A-scan sintético: {ny_a} × {nx_a} A-scans, {nt_a} amostras "
+                       "(ecos em ~2.0, ~3.7 e ~5.4 μs)")
+    
+    elif st.button("🎲 Gerar Dados Sintéticos"):
         df_original = gerar_dados_sinteticos(nx_sint, ny_sint, noise)
         st.success(f"✅ Dataset sintético gerado: {len(df_original)} pontos")
         st.dataframe(df_original.head(10), use_container_width=True)
@@ -490,6 +1034,95 @@ with tab3:
             "text/csv"
         )
 
+with tab3:
+    try:
+        st.markdown(carregar_readme(), unsafe_allow_html=True)
+    except Exception as e:
+        st.error(f"Não foi possível carregar o README: {e}")
+
+# ============================================================================
+# A-SCAN MULTI-GATE - PILHA DE CAMADAS
+# ============================================================================
+
+if modo == "A-scan multi-gate (NPY/NPZ)" and ascan is not None and gates:
+    
+    st.header("🧱 Perfil em Profundidade (Multi-gate)")
+    
+    cubo, tempo_us, x_ascan, y_ascan = ascan
+    with st.spinner("Detectando ecos nos gates..."):
+        pilha_tof = calcular_pilha_gates(
+            cubo, tempo_us, tuple(gates), referencia_interface
+        )
+    
+    # Velocidade de cada fatia: caminho de ida e volta entre refletores vizinhos
+    espessuras_camadas = np.diff(profundidades, prepend=0.0)
+    pilha_v = calcular_velocidade_longitudinal(pilha_tof, espessuras_camadas[:, None, None])
+    if usar_temp:
+        pilha_v = aplicar_correcao_termica(pilha_v, temp_medida, temp_ref, coef_termico)
+    
+    n_camadas = pilha_tof.shape[0]
+    X_ascan, Y_ascan = np.meshgrid(x_ascan, y_ascan)
+    
+    # Referência comum (v_ref), por camada no ROI ou mediana de cada camada
+    if metodo_ref == "ROI (região de interesse)":
+        st.subheader("🎯 Seleção de Região de Referência (ROI)")
+        mask_roi = selecionar_roi(X_ascan, Y_ascan)
+        if mask_roi.any():
+            v_ref_camadas = np.nanmean(pilha_v[:, mask_roi], axis=1)
+            st.success(f"✓ v_ref por camada calculado do ROI ({mask_roi.sum()} pontos): "
+                       + ", ".join(f"{v:.2f}" for v in v_ref_camadas) + " m/s")
+        else:
+            st.warning("⚠️ ROI vazio, usando valor padrão")
+            v_ref_camadas = np.full(n_camadas, 5900.0)
+    elif metodo_ref == "Valor numérico":
+        v_ref_camadas = np.full(n_camadas, v_ref_manual)
+    else:
+        v_ref_camadas = np.nanmedian(pilha_v.reshape(n_camadas, -1), axis=1)
+        st.warning("⚠️ Referência na mediana de cada camada: o índice mostra apenas a "
+                   "variação dentro de cada camada; médias de camadas diferentes não são comparáveis")
+    pilha_idx = calcular_indice_tensao(pilha_v, v_ref_camadas[:, None, None])
+    
+    amostras_gate = sum(np.searchsorted(tempo_us, fim) - np.searchsorted(tempo_us, ini)
+                        for ini, fim in gates)
+    st.caption(f"Pilha [{n_camadas}, {pilha_tof.shape[1]}, {pilha_tof.shape[2]}] "
+               f"calculada com {amostras_gate} de {len(tempo_us)} amostras por A-scan")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        camada = st.slider("Camada (gate)", 1, n_camadas, 1) if n_camadas > 1 else 1
+    with col2:
+        linha_secao = st.slider("Seção transversal em Y (mm)",
+                                float(y_ascan.min()), float(y_ascan.max()),
+                                float(np.median(y_ascan)))
+    
+    # Seção transversal camada × X na linha mais próxima do Y escolhido
+    i_linha = int(np.argmin(np.abs(y_ascan - linha_secao)))
+    fig_secao = plotar_secao_transversal(
+        x_ascan, pilha_idx[:, i_linha, :],
+        f"Seção Transversal em Y = {y_ascan[i_linha]:.1f} mm",
+        colormap, vmin_percentil, vmax_percentil, profundidades
+    )
+    st.pyplot(fig_secao)
+    
+    # Perfil médio em profundidade (comparável entre camadas com referência comum)
+    st.dataframe(pd.DataFrame({
+        'camada': np.arange(1, n_camadas + 1),
+        'profundidade_mm': [f"{z0:g}-{z1:g}" for z0, z1 in
+                            zip(np.concatenate([[0.0], profundidades[:-1]]), profundidades)],
+        'v_media_m_s': np.nanmean(pilha_v.reshape(n_camadas, -1), axis=1),
+        'v_ref_m_s': v_ref_camadas,
+        'indice_medio': np.nanmean(pilha_idx.reshape(n_camadas, -1), axis=1)
+    }), hide_index=True)
+    
+    # A camada selecionada segue o fluxo padrão de visualização e exportação
+    df_original = pd.DataFrame({
+        'x': X_ascan.flatten(),
+        'y': Y_ascan.flatten(),
+        'tof_us': pilha_tof[camada - 1].flatten(),
+        'velocidade': pilha_v[camada - 1].flatten(),
+        'indice_tensao': pilha_idx[camada - 1].flatten()
+    })
+
 # ============================================================================
 # PROCESSAMENTO E VISUALIZAÇÃO
 # ============================================================================
@@ -502,6 +1135,8 @@ if df_original is not None and len(df_original) > 0:
     colunas_obrigatorias = ['x', 'y']
     if modo == "Longitudinal (TOF)":
         colunas_obrigatorias.append('tof_us')
+    elif modo == "A-scan multi-gate (NPY/NPZ)":
+        colunas_obrigatorias.extend(['tof_us', 'indice_tensao'])
     else:
         colunas_obrigatorias.extend(['v1', 'v2'])
     
@@ -528,8 +1163,8 @@ if df_original is not None and len(df_original) > 0:
                 espessura_mm
             )
         
-        # Correção térmica
-        if usar_temp and abs(temp_medida - temp_ref) > 0.1:
+        # Correção térmica (mesma condição da propagação Monte Carlo)
+        if usar_temp:
             df['velocidade'] = aplicar_correcao_termica(
                 df['velocidade'].values,
                 temp_medida,
@@ -539,39 +1174,18 @@ if df_original is not None and len(df_original) > 0:
             st.info(f"✓ Correção térmica aplicada: ΔT = {temp_medida - temp_ref:.1f}°C")
         
         # Definir v_ref
+        mascara_roi_mc = None
         if metodo_ref == "ROI (região de interesse)":
             st.subheader("🎯 Seleção de Região de Referência (ROI)")
             
-            col1, col2 = st.columns(2)
-            with col1:
-                x_min_roi = st.slider("X mínimo (mm)", 
-                                      float(df['x'].min()), 
-                                      float(df['x'].max()), 
-                                      float(df['x'].min()))
-                x_max_roi = st.slider("X máximo (mm)", 
-                                      float(df['x'].min()), 
-                                      float(df['x'].max()), 
-                                      float(df['x'].max()))
-            with col2:
-                y_min_roi = st.slider("Y mínimo (mm)", 
-                                      float(df['y'].min()), 
-                                      float(df['y'].max()), 
-                                      float(df['y'].min()))
-                y_max_roi = st.slider("Y máximo (mm)", 
-                                      float(df['y'].min()), 
-                                      float(df['y'].max()), 
-                                      float(df['y'].max()))
-            
             # Filtrar ROI
-            mask_roi = (
-                (df['x'] >= x_min_roi) & (df['x'] <= x_max_roi) &
-                (df['y'] >= y_min_roi) & (df['y'] <= y_max_roi)
-            )
+            mask_roi = selecionar_roi(df['x'], df['y'])
             df_roi = df[mask_roi]
             
             if len(df_roi) > 0:
                 v_ref = np.nanmean(df_roi['velocidade'])
                 st.success(f"✓ v_ref calculado do ROI: {v_ref:.2f} m/s ({len(df_roi)} pontos)")
+                mascara_roi_mc = mask_roi.values
             else:
                 st.warning("⚠️ ROI vazio, usando valor padrão")
                 v_ref = 5900.0
@@ -582,6 +1196,38 @@ if df_original is not None and len(df_original) > 0:
         # Calcular índice de tensão
         df['indice_tensao'] = calcular_indice_tensao(df['velocidade'].values, v_ref)
         
+        # Propagação de incertezas
+        if usar_mc:
+            with st.spinner("Propagando incertezas (Monte Carlo)..."):
+                incerteza_mc = propagar_incerteza_mc(
+                    df['tof_us'].values,
+                    espessura_mm,
+                    v_ref,
+                    K_val if usar_K else None,
+                    incertezas,
+                    temp_medida,
+                    temp_ref,
+                    coef_termico,
+                    mascara_roi=mascara_roi_mc,
+                    n_amostras=n_amostras_mc,
+                    nivel_confianca=nivel_confianca
+                )
+            for nome in ['indice_std', 'indice_ic_inf', 'indice_ic_sup']:
+                df[nome] = incerteza_mc[nome]
+            if 'sigma_std' in incerteza_mc:
+                df['sigma_mpa'] = df['indice_tensao'] / K_val
+                for nome in ['sigma_std', 'sigma_ic_inf', 'sigma_ic_sup']:
+                    df[f'{nome}_mpa'] = incerteza_mc[nome]
+        
+    elif modo == "A-scan multi-gate (NPY/NPZ)":
+        st.subheader(f"Modo A-scan Multi-gate - Camada {camada} de {n_camadas}")
+        
+        # Índice já calculado na pilha com a referência escolhida
+        v_ref = v_ref_camadas[camada - 1]
+        z0, z1 = np.concatenate([[0.0], profundidades])[camada - 1:camada + 1]
+        st.info(f"✓ Camada {z0:g}-{z1:g} mm: TOF médio {np.nanmean(df['tof_us']):.4f} μs, "
+                f"v_ref {v_ref:.2f} m/s")
+        
     else:  # Modo Cisalhante
         st.subheader("Modo Cisalhante - Análise de Birefringência")
         
@@ -601,6 +1247,10 @@ if df_original is not None and len(df_original) > 0:
     
     st.header("📊 Visualizações")
     
+    if usar_mc and modo != "Longitudinal (TOF)":
+        st.warning("⚠️ A propagação de incertezas está disponível apenas no modo longitudinal")
+    incerteza_ativa = usar_mc and 'indice_std' in df.columns
+    
     # Estatísticas
     idx_clean = df['indice_tensao'].values
     idx_clean = idx_clean[np.isfinite(idx_clean)]
@@ -643,6 +1293,29 @@ if df_original is not None and len(df_original) > 0:
         else:
             st.error("Não foi possível interpolar os dados. Verifique qualidade dos dados.")
     
+    # Mapas de incerteza
+    if incerteza_ativa:
+        st.subheader(f"🎯 Mapas de Incerteza (Monte Carlo, {n_amostras_mc} amostras)")
+        
+        df['indice_ic_largura'] = df['indice_ic_sup'] - df['indice_ic_inf']
+        col1, col2 = st.columns(2)
+        for coluna, nome, titulo, rotulo in [
+            (col1, 'indice_std', "Desvio Padrão do Índice", 'Desvio padrão (Δv/v)'),
+            (col2, 'indice_ic_largura', f"Largura do IC {nivel_confianca:g}% do Índice",
+             f'Largura do IC {nivel_confianca:g}% (Δv/v)'),
+        ]:
+            with coluna:
+                Xu, Yu, Zu, _ = interpolar_grade(df, nome)
+                if Xu is not None:
+                    st.pyplot(plotar_heatmap(Xu, Yu, Zu, titulo, "inferno",
+                                             vmin_percentil, vmax_percentil, rotulo))
+        
+        if 'sigma_std_mpa' in df.columns:
+            st.info(f"""
+            **Incerteza de σ (mediana por ponto):** ±{np.nanmedian(df['sigma_std_mpa']):.2f} MPa (1 desvio padrão)
+            - IC {nivel_confianca:g}% da tensão média: [{np.nanpercentile(incerteza_mc['sigma_media'], (100 - nivel_confianca) / 2):.2f}, {np.nanpercentile(incerteza_mc['sigma_media'], (100 + nivel_confianca) / 2):.2f}] MPa
+            """)
+    
     # Histograma
     st.subheader("📈 Distribuição do Índice")
     
@@ -694,6 +1367,19 @@ if df_original is not None and len(df_original) > 0:
             'K': K_val,
             'colormap': colormap
         }
+        if incerteza_ativa:
+            parametros_relatorio['incerteza'] = {
+                'entradas': incertezas,
+                'v_ref_roi': mascara_roi_mc is not None,
+                'n_amostras': n_amostras_mc,
+                'nivel_confianca': nivel_confianca,
+                'resultado': incerteza_mc
+            }
+        if modo == "A-scan multi-gate (NPY/NPZ)":
+            parametros_relatorio['referencia_camadas'] = metodo_ref
+            parametros_relatorio['profundidades'] = "; ".join(f"{z:g}" for z in profundidades) + " mm"
+            parametros_relatorio['gates'] = "; ".join(f"{ini:g}-{fim:g} μs" for ini, fim in gates)
+            parametros_relatorio['camada'] = f"{camada} de {n_camadas}"
         
         relatorio_texto = gerar_relatorio(df, parametros_relatorio)
         
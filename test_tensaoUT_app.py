@@ -0,0 +1,71 @@
+"""
+Verificações numéricas das funções de processamento do tensaoUT_app
+
+Uso:
+    python -m pytest -q
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("scipy")
+
+import tensaoUT_app as app
+
+
+@pytest.fixture(scope="module")
+def ascan_sem_ruido():
+    np.random.seed(0)
+    return app.gerar_ascan_sintetico(30, 20, 0.0)
+
+
+def test_tof_de_um_gate_independe_dos_demais(ascan_sem_ruido):
+    cubo, tempo_us, _, _ = ascan_sem_ruido
+    isolado = app.extrair_tof_gates(cubo, tempo_us, [(1.8, 2.3)])[0]
+    com_vizinho = app.extrair_tof_gates(cubo, tempo_us, [(1.8, 2.3), (3.4, 4.0)])[0]
+    vizinho_largo = app.extrair_tof_gates(cubo, tempo_us, [(1.8, 2.3), (3.4, 5.0)])[0]
+
+    np.testing.assert_array_equal(isolado, com_vizinho)
+    np.testing.assert_array_equal(isolado, vizinho_largo)
+
+
+def test_tof_sem_efeito_de_borda_do_gate(ascan_sem_ruido):
+    cubo, tempo_us, _, _ = ascan_sem_ruido
+    # Eco de interface em exatamente 2.0 μs
+    for gate in [(1.8, 2.3), (1.85, 2.4), (1.7, 2.3)]:
+        tof = app.extrair_tof_gates(cubo, tempo_us, [gate])[0]
+        np.testing.assert_allclose(tof, 2.0, atol=1e-6)
+
+
+def _incertezas(**valores):
+    base = {'espessura_mm': 0.0, 'tof_us': 0.0, 'temperatura': 0.0, 'v_ref': 0.0, 'K_rel': 0.0}
+    base.update(valores)
+    return base
+
+
+def test_mc_roi_cancela_erro_de_temperatura():
+    rng = np.random.default_rng(1)
+    tof = 3.39 * (1 + 5e-4 * rng.standard_normal(400))
+    roi = np.zeros(400, dtype=bool)
+    roi[:100] = True
+    v_nominal = app.calcular_velocidade_longitudinal(tof, 10.0)
+    v_ref = np.nanmean(v_nominal[roi])
+
+    # max_elementos pequeno força vários blocos, inclusive fora do ROI
+    resultado = app.propagar_incerteza_mc(
+        tof, 10.0, v_ref, 1e-5, _incertezas(temperatura=0.5),
+        20.0, 20.0, -0.9, mascara_roi=roi, n_amostras=200, max_elementos=200 * 64
+    )
+    # Sem o ROI por amostra, o erro de temperatura dava ~7.7e-5 por ponto
+    assert np.nanmax(resultado['indice_std']) < 1e-6
+
+
+def test_mc_espessura_e_erro_sistematico():
+    tof = np.full(2000, 2 * 10.0 / 5900 * 1e3)
+    resultado = app.propagar_incerteza_mc(
+        tof, 10.0, 5900.0, None, _incertezas(espessura_mm=0.01),
+        20.0, 20.0, 0.0, n_amostras=1000
+    )
+    # 0.01 mm em 10 mm desloca a peça inteira em ~1e-3: a média não o reduz
+    assert np.std(resultado['indice_media']) == pytest.approx(1e-3, rel=0.1)